@@ -4,20 +4,21 @@ creates build files for ninja.
 """
 #! /usr/bin/env python3
 import argparse
+import hashlib
+import io
 import os
 import shutil
 import sys
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Union
+from typing import TYPE_CHECKING, Dict, List, Set, Union
 
-import ninja_syntax
-import splat
-import splat.scripts.split as split
-from splat.segtypes.linker_entry import LinkerEntry
-
-import yaml
+# splat, yaml and ninja_syntax are imported lazily in the functions that need
+# them, so --clean-only and --help runs don't pay splat's large import cost
+if TYPE_CHECKING:
+    from splat.segtypes.linker_entry import LinkerEntry
 
 #MARK: Constants
 ROOT = Path(__file__).parent.resolve()
@@ -43,6 +44,20 @@ COMPILE_CMD = f"{GAME_GCC_CMD}"
 if sys.platform == "linux" or sys.platform == "linux2":
     COMPILE_CMD = f"{WINE} {GAME_GCC_CMD}"
 
+# Launch the compiler through ccache when available so byte-identical inputs
+# are served from the cache on rebuilds. ccache must see ee-gcc.exe itself
+# as the compiler to hash it and form a cache key, so wine is applied via
+# CCACHE_PREFIX/CCACHE_PREFIX_CPP rather than prepended to the command.
+# COMPILERCHECK=content hashes the compiler binary and BASEDIR keeps paths
+# relative so hits are stable across checkouts. Only the ninja cc rule uses
+# this; permuter_settings.toml keeps the plain COMPILE_CMD.
+CC_RULE_CMD = COMPILE_CMD
+if shutil.which("ccache"):
+    ccache_vars = f'CCACHE_COMPILERCHECK=content CCACHE_BASEDIR="{ROOT}"'
+    if sys.platform == "linux" or sys.platform == "linux2":
+        ccache_vars += f" CCACHE_PREFIX={WINE} CCACHE_PREFIX_CPP={WINE}"
+    CC_RULE_CMD = f"{ccache_vars} ccache {GAME_GCC_CMD}"
+
 CATEGORY_MAP = {
     "P2": "Engine",
     "splice": "Splice",
@@ -51,6 +66,67 @@ CATEGORY_MAP = {
     "data": "Data",
 }
 
+# Source patterns objdiff watches for rebuilds
+WATCH_PATTERNS = (
+    "src/**/*.c",
+    "src/**/*.cp",
+    "src/**/*.cpp",
+    "src/**/*.cxx",
+    "src/**/*.h",
+    "src/**/*.hp",
+    "src/**/*.hpp",
+    "src/**/*.hxx",
+    "src/**/*.s",
+    "src/**/*.S",
+    "src/**/*.asm",
+    "src/**/*.inc",
+    "src/**/*.py",
+    "src/**/*.yml",
+    "src/**/*.txt",
+    "src/**/*.json",
+)
+
+def iter_files(root, suffix: str):
+    """
+    Yield the paths (as strings) of all files under root with the given
+    suffix. A scandir-based walk is much faster than pathlib's rglob on
+    large trees since it avoids building a Path and stat for every entry.
+    """
+    for entry in os.scandir(root):
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_files(entry.path, suffix)
+        elif entry.name.endswith(suffix):
+            yield entry.path
+
+CONFIGURE_CACHE_PATH = ".configure_cache.json"
+
+def compute_configure_fingerprint() -> str:
+    """
+    Fingerprint the inputs of the configure step: the splat yaml, the
+    mtimes of the generated asm files and the set of sources in src/.
+    Used to skip splat and build file generation when nothing changed
+    since the last run.
+    """
+    hasher = hashlib.sha1()
+    hasher.update(Path(YAML_FILE).read_bytes())
+
+    asm_dir = ROOT / "asm"
+    if asm_dir.is_dir():
+        for path in sorted(iter_files(asm_dir, ".s")):
+            hasher.update(path.encode())
+            hasher.update(str(os.stat(path).st_mtime_ns).encode())
+
+    # objdiff.json's base_path/has_src depends on which units have a source
+    # file in src/, so adding or removing one must invalidate the cache;
+    # only the paths matter, not their contents
+    src_dir = ROOT / "src"
+    if src_dir.is_dir():
+        src_files = [path for suffix in (".c", ".cpp") for path in iter_files(src_dir, suffix)]
+        for path in sorted(src_files):
+            hasher.update(path.encode())
+
+    return hasher.hexdigest()
+
 def clean():
     """
     Clean all products of the build process.
@@ -58,6 +134,8 @@ def clean():
     files_to_clean = [
         ".splache",
         ".ninja_log",
+        CONFIGURE_CACHE_PATH,
+        OPCODES_CACHE_PATH,
         "build.ninja",
         "permuter_settings.toml",
         "objdiff.json",
@@ -89,15 +167,33 @@ compiler_type = "gcc"
 """)
 
 #MARK: Build
-def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_only=False, dual_objects=False):
+def build_stuff(linker_entries: List["LinkerEntry"], skip_checksum=False, objects_only=False, dual_objects=False, pretty_json=False):
     """
     Build the objects and the final ELF file.
     If objects_only is True, only build objects and skip linking/checksum.
     If dual_objects is True, build objects twice: once normally, once with -DSKIP_ASM.
+    If pretty_json is True, write objdiff.json indented instead of compact.
     """
+    import ninja_syntax
+    from splat.segtypes.common.asm import CommonSegAsm
+    from splat.segtypes.common.bin import CommonSegBin
+    from splat.segtypes.common.c import CommonSegC
+    from splat.segtypes.common.data import CommonSegData
+    from splat.segtypes.common.databin import CommonSegDatabin
+    from splat.segtypes.common.rodatabin import CommonSegRodatabin
+    from splat.segtypes.common.textbin import CommonSegTextbin
+
     built_objects: Set[Path] = set()
     objdiff_units = []  # For objdiff.json
 
+    # Index src/ by file stem once; build() consults this per objdiff unit
+    # instead of walking the whole tree with rglob for every unit
+    src_index: Dict[str, List[str]] = {}
+    for suffix in (".c", ".cpp"):
+        for src_file in iter_files("src", suffix):
+            name = os.path.basename(src_file)
+            src_index.setdefault(name[: name.rfind(".")], []).append(src_file)
+
     def build(
         object_paths: Union[Path, List[Path]],
         src_paths: List[Path],
@@ -141,8 +237,14 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
 
         # Otherwise, use the original object_paths (with .s.o, .c.o, etc.)
 
+        # Coerce the source paths to strings once; os.fspath is cheaper than
+        # str() round-tripping and the same list is reused for every object
+        src_strs = [os.fspath(s) for s in src_paths]
+
         # Add object paths to built_objects
-        for idx, object_path in enumerate(object_paths):
+        for object_path in object_paths:
+            obj_str = os.fspath(object_path)
+
             if object_path.suffix == ".o":
                 built_objects.add(object_path)
 
@@ -151,9 +253,9 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
             if extra_flags:
                 build_vars["cflags"] = extra_flags
             ninja.build(
-                outputs=[str(object_path)],
+                outputs=[obj_str],
                 rule=task,
-                inputs=[str(s) for s in src_paths],
+                inputs=src_strs,
                 variables=build_vars,
                 implicit_outputs=implicit_outputs,
             )
@@ -179,19 +281,14 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
                 else:
                     name = object_path.stem
                     # Ensure `rel` is defined so later code can compute src-based paths
-                    try:
-                        rel = Path(object_path)
-                    except Exception:
-                        rel = Path(str(object_path))
+                    rel = Path(object_path)
 
-                if "target" in str(object_path):
-                    target_path = str(object_path)
+                if "target" in obj_str:
+                    target_path = obj_str
 
-                    # Determine if a .c or .cpp file exists in src/ for this unit (recursively)
+                    # Determine if a .c or .cpp file exists in src/ for this unit
                     src_base = rel.with_suffix("")
-                    src_c_files = list(Path("src").rglob(src_base.name + ".c"))
-                    src_cpp_files = list(Path("src").rglob(src_base.name + ".cpp"))
-                    has_src = bool(src_c_files or src_cpp_files)
+                    has_src = bool(src_index.get(src_base.name))
 
                     # Determine the category based on the name
                     categories = [name.split("/")[0]]
@@ -209,19 +306,17 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
                     }
 
                     if has_src:
-                        # Replace only the path segment named 'target' with 'current',
-                        # preserving any filenames that may contain the substring "target".
-                        op = Path(object_path)
-                        parts = list(op.parts)
-                        for idx, part in enumerate(parts):
-                            if part == "target":
-                                parts[idx] = "current"
-                                break
-                        base_path = str(Path(*parts))
-                        unit["base_path"] = base_path
+                        # Replace only the 'target' directory segment with
+                        # 'current'; objects land under obj/target/, so the
+                        # slash-delimited form can't hit a filename that
+                        # merely contains "target"
+                        unit["base_path"] = obj_str.replace("/target/", "/current/", 1)
                     objdiff_units.append(unit)
 
-    ninja = ninja_syntax.Writer(open(str(ROOT / "build.ninja"), "w", encoding="utf-8"), width=9999)
+    # Emit the build file into an in-memory buffer and write it to disk in
+    # one go at the end, rather than a small write per ninja.build call
+    ninja_buffer = io.StringIO()
+    ninja = ninja_syntax.Writer(ninja_buffer, width=9999)
 
     #MARK: Rules
     cross = "mips-linux-gnu-"
@@ -237,7 +332,7 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
     ninja.rule(
         "cc",
         description="cc $in",
-        command=f"{COMPILE_CMD} $cflags -o $out && {cross}strip $out -N dummy-symbol-name",
+        command=f"{CC_RULE_CMD} $cflags -o $out && {cross}strip $out -N dummy-symbol-name",
     )
 
     ninja.rule(
@@ -259,6 +354,18 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
     )
 
     #MARK: Build
+    # Map segment types to build rules; everything except C sources is
+    # assembled with "as"
+    seg_rules = (
+        (CommonSegC, "cc"),
+        (CommonSegAsm, "as"),
+        (CommonSegData, "as"),
+        (CommonSegDatabin, "as"),
+        (CommonSegRodatabin, "as"),
+        (CommonSegTextbin, "as"),
+        (CommonSegBin, "as"),
+    )
+
     # Build all the objects
     for entry in linker_entries:
         seg = entry.segment
@@ -269,50 +376,22 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
         if entry.object_path is None:
             continue
 
-        if isinstance(seg, splat.segtypes.common.asm.CommonSegAsm) or isinstance(
-            seg, splat.segtypes.common.data.CommonSegData
-        ):
-            if dual_objects:
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/target", collect_objdiff=True, orig_entry=entry)
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/current", extra_flags="-DSKIP_ASM")
-            else:
-                build(entry.object_path, entry.src_paths, "as")
-        elif isinstance(seg, splat.segtypes.common.c.CommonSegC):
-            if dual_objects:
-                print(f"Building C segment: {entry.object_path} from {entry.src_paths}")
-                build(entry.object_path, entry.src_paths, "cc", out_dir="obj/target", collect_objdiff=True, orig_entry=entry)
-                build(entry.object_path, entry.src_paths, "cc", out_dir="obj/current", extra_flags="-DSKIP_ASM")
-            else:
-                build(entry.object_path, entry.src_paths, "cc")
-        elif isinstance(seg, splat.segtypes.common.databin.CommonSegDatabin):
-            if dual_objects:
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/target", collect_objdiff=True, orig_entry=entry)
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/current", extra_flags="-DSKIP_ASM")
-            else:
-                build(entry.object_path, entry.src_paths, "as")
-        elif isinstance(seg, splat.segtypes.common.rodatabin.CommonSegRodatabin):
-            if dual_objects:
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/target", collect_objdiff=True, orig_entry=entry)
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/current", extra_flags="-DSKIP_ASM")
-            else:
-                build(entry.object_path, entry.src_paths, "as")
-        elif isinstance(seg, splat.segtypes.common.textbin.CommonSegTextbin):
-            if dual_objects:
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/target", collect_objdiff=True, orig_entry=entry)
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/current", extra_flags="-DSKIP_ASM")
-            else:
-                build(entry.object_path, entry.src_paths, "as")
-        elif isinstance(seg, splat.segtypes.common.bin.CommonSegBin):
-            if dual_objects:
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/target", collect_objdiff=True, orig_entry=entry)
-                build(entry.object_path, entry.src_paths, "as", out_dir="obj/current", extra_flags="-DSKIP_ASM")
-            else:
-                build(entry.object_path, entry.src_paths, "as")
-        else:
+        rule = next((r for cls, r in seg_rules if isinstance(seg, cls)), None)
+        if rule is None:
             print(f"ERROR: Unsupported build segment type {seg.type}")
             sys.exit(1)
 
+        if dual_objects:
+            if rule == "cc":
+                print(f"Building C segment: {entry.object_path} from {entry.src_paths}")
+            build(entry.object_path, entry.src_paths, rule, out_dir="obj/target", collect_objdiff=True, orig_entry=entry)
+            build(entry.object_path, entry.src_paths, rule, out_dir="obj/current", extra_flags="-DSKIP_ASM")
+        else:
+            build(entry.object_path, entry.src_paths, rule)
+
     if objects_only:
+        (ROOT / "build.ninja").write_text(ninja_buffer.getvalue(), encoding="utf-8")
+
         # Write objdiff.json if dual_objects (i.e. --objects)
         if dual_objects:
             objdiff = {
@@ -321,29 +400,17 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
                 "custom_args": [],
                 "build_target": False,
                 "build_base": True,
-                "watch_patterns": [
-                    "src/**/*.c",
-                    "src/**/*.cp",
-                    "src/**/*.cpp",
-                    "src/**/*.cxx",
-                    "src/**/*.h",
-                    "src/**/*.hp",
-                    "src/**/*.hpp",
-                    "src/**/*.hxx",
-                    "src/**/*.s",
-                    "src/**/*.S",
-                    "src/**/*.asm",
-                    "src/**/*.inc",
-                    "src/**/*.py",
-                    "src/**/*.yml",
-                    "src/**/*.txt",
-                    "src/**/*.json"
-                ],
+                "watch_patterns": list(WATCH_PATTERNS),
                 "units": objdiff_units,
                 "progress_categories": [ {"id": id, "name": name} for id, name in CATEGORY_MAP.items() ],
             }
             with open("objdiff.json", "w", encoding="utf-8") as f:
-                json.dump(objdiff, f, indent=2)
+                # objdiff only reads this file; write it compact unless a
+                # human-readable version was requested
+                if pretty_json:
+                    json.dump(objdiff, f, indent=2)
+                else:
+                    json.dump(objdiff, f, separators=(",", ":"))
         return
 
     ninja.build(
@@ -370,13 +437,15 @@ def build_stuff(linker_entries: List[LinkerEntry], skip_checksum=False, objects_
     else:
         print("Skipping checksum step")
 
+    (ROOT / "build.ninja").write_text(ninja_buffer.getvalue(), encoding="utf-8")
+
 #MARK: Short loop fix
 # Pattern to workaround unintended nops around loops
 COMMENT_PART = r"\/\* (.+) ([0-9A-Z]{2})([0-9A-Z]{2})([0-9A-Z]{2})([0-9A-Z]{2}) \*\/"
 INSTRUCTION_PART = r"(\b(bne|bnel|beq|beql|bnez|bnezl|beqzl|bgez|bgezl|bgtz|bgtzl|blez|blezl|bltz|bltzl|b)\b.*)"
 OPCODE_PATTERN = re.compile(f"{COMMENT_PART}  {INSTRUCTION_PART}")
 
-PROBLEMATIC_FUNCS = set(
+PROBLEMATIC_FUNCS = frozenset(
     [
         "UpdateJtActive__FP2JTP3JOYf", # P2/jt
         "AddMatrix4Matrix4__FP7MATRIX4N20", # P2/mat
@@ -397,37 +466,113 @@ PROBLEMATIC_FUNCS = set(
     ]
 )
 
+OPCODES_CACHE_PATH = ".opcodes_cache.json"
+
 def replace_instructions_with_opcodes(asm_folder: Path) -> None:
     """
     Replace branch instructions with raw opcodes for functions that trigger the short loop bug.
+    Files whose checksum is unchanged since the last run are skipped.
     """
     nm_folder = ROOT / asm_folder / "nonmatchings"
 
-    for p in nm_folder.rglob("*.s"):
-        if p.stem not in PROBLEMATIC_FUNCS:
-            continue
+    try:
+        with open(OPCODES_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        cache = {}
 
-        with p.open("r") as file:
-            content = file.read()
+    # Walk the tree with os.walk and filter on the raw filename; rglob would
+    # build a Path and stat for tens of thousands of files only to discard
+    # all but the handful of problematic ones
+    for dirpath, _, filenames in os.walk(nm_folder):
+        for filename in filenames:
+            if not filename.endswith(".s") or filename[:-2] not in PROBLEMATIC_FUNCS:
+                continue
 
-        if re.search(OPCODE_PATTERN, content):
-            # Reference found
-            # Embed the opcode, we have to swap byte order for correct endianness
-            content = re.sub(
-                OPCODE_PATTERN,
-                r"/* \1 \2\3\4\5 */  .word      0x\5\4\3\2 /* \6 */",
-                content,
-            )
+            p = Path(dirpath) / filename
+            _replace_opcodes_in_file(p, cache)
+
+    with open(OPCODES_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+def _replace_opcodes_in_file(p: Path, cache: dict) -> None:
+    """
+    Apply the short loop opcode replacement to a single file, updating the
+    checksum cache entry for it.
+    """
+    data = p.read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if cache.get(str(p)) == digest:
+        # Already processed on a previous run and unchanged since
+        return
+
+    content = data.decode("utf-8")
+
+    if re.search(OPCODE_PATTERN, content):
+        # Reference found
+        # Embed the opcode, we have to swap byte order for correct endianness
+        content = re.sub(
+            OPCODE_PATTERN,
+            r"/* \1 \2\3\4\5 */  .word      0x\5\4\3\2 /* \6 */",
+            content,
+        )
+
+        # Write the updated content back to the file
+        p.write_text(content)
+        digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    cache[str(p)] = digest
 
-            # Write the updated content back to the file
-            with p.open("w") as file:
-                file.write(content)
+# Matches a local label definition (label at line start, followed by a colon)
+# or a bare reference to one
+LABEL_REGEX = re.compile(r"^\s*(?P<def>\.L[0-9A-F]{8}):|(?P<ref>\.L[0-9A-F]{8})\b", re.MULTILINE)
+
+def _scan_asm_file(file_path: str):
+    """
+    Scan a single asm file for local label definitions and references.
+    Runs in a worker process and returns partial results for the parent to merge.
+    """
+    with open(file_path, "r") as f:
+        content = f.read()
+
+    definitions = []
+    references = []
+    for match in LABEL_REGEX.finditer(content):
+        if match.group("def"):
+            definitions.append(match.group("def"))
+        else:
+            references.append(match.group("ref"))
+
+    return file_path, definitions, references
+
+def _promote_labels_in_file(args):
+    """
+    Rewrite a single asm file, promoting the given labels to global labels.
+    Runs in a worker process; only writes the file back if it changed.
+    """
+    file_path, def_regex, ref_regex = args
+
+    with open(file_path, "r") as f:
+        content = f.read()
+
+    original_content = content
+
+    # Promote definitions first, then rewrite remaining references.
+    # The label name minus the leading dot is the global label name.
+    content = def_regex.sub(lambda m: f"glabel {m.group(1)[1:]}", content)
+    content = ref_regex.sub(lambda m: m.group(1)[1:], content)
+
+    if content != original_content:
+        with open(file_path, "w") as f:
+            f.write(content)
 
 def promote_local_labels(yaml_path: Path, splat_config: dict):
     """
     Scans generated assembly files for cross-file local label references
     and promotes them to global labels to fix linker errors.
     """
+    import yaml
+
     print("Checking for local labels to promote...")
     asm_path = Path(splat_config["options"]["asm_path"])
     
@@ -473,13 +618,13 @@ def promote_local_labels(yaml_path: Path, splat_config: dict):
 
             if dir_path_nonmatching.is_dir():
                 print(f"  Found asm directory: {dir_path_nonmatching}")
-                files_in_group.extend(list(dir_path_nonmatching.rglob("*.s")))
+                files_in_group.extend(iter_files(dir_path_nonmatching, ".s"))
             elif dir_path_main.is_dir():
                 print(f"  Found asm directory: {dir_path_main}")
-                files_in_group.extend(list(dir_path_main.rglob("*.s")))
+                files_in_group.extend(iter_files(dir_path_main, ".s"))
             elif file_path.is_file():
                 print(f"  Found asm file: {file_path}")
-                files_in_group.append(file_path)
+                files_in_group.append(os.fspath(file_path))
             else:
                 print(f"  Warning: Could not find asm directory or file for segment '{seg_name}'")
 
@@ -488,28 +633,22 @@ def promote_local_labels(yaml_path: Path, splat_config: dict):
             print(f"No assembly files found for group '{group_name}'. Skipping.")
             continue
 
-        # Pass 1: Find all local label definitions and where they live
+        # Pass 1: Scan every file for label definitions and references.
+        # The per-file scans are independent, so fan them out across cores.
         label_definitions = {}
-        label_def_regex = re.compile(r"^\s*(\.L[0-9A-F]{8}):")
-        for file_path in files_in_group:
-            with open(file_path, "r") as f:
-                for line in f:
-                    match = label_def_regex.match(line)
-                    if match:
-                        #print(f"    Found label definition: {match.group(1)} in {file_path}")
-                        label_definitions[match.group(1)] = file_path
+        label_references = []
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for file_path, definitions, references in executor.map(_scan_asm_file, files_in_group):
+                for label in definitions:
+                    label_definitions[label] = file_path
+                for label in references:
+                    label_references.append((label, file_path))
 
         # Pass 2: Find all labels that are referenced from a different file
         labels_to_promote = set()
-        label_ref_regex = re.compile(r"(\.L[0-9A-F]{8})\b")
-        for file_path in files_in_group:
-            with open(file_path, "r") as f:
-                content = f.read()
-                for match in label_ref_regex.finditer(content):
-                    #print(f"    Found label reference: {match.group(1)} in {file_path}")
-                    label = match.group(1)
-                    if label in label_definitions and label_definitions[label] != file_path:
-                        labels_to_promote.add(label)
+        for label, file_path in label_references:
+            if label in label_definitions and label_definitions[label] != file_path:
+                labels_to_promote.add(label)
 
         if not len(labels_to_promote):
             print(f"No cross-file local labels found in group '{group_name}'.")
@@ -517,22 +656,14 @@ def promote_local_labels(yaml_path: Path, splat_config: dict):
         
         print(f"Promoting {len(labels_to_promote)} labels: {', '.join(sorted(list(labels_to_promote)))}...")
 
-        # Pass 3: Rewrite the files, promoting the necessary labels
-        for file_path in files_in_group:
-            with open(file_path, "r") as f:
-                content = f.read()
-            
-            original_content = content
-            
-            for label in labels_to_promote:
-                global_label = label[1:] # Remove the leading dot
-                # print(f"  Promoting label {label} to {global_label} in {file_path}")
-                content = re.sub(f"^\s*{re.escape(label)}:", f"glabel {global_label}", content, flags=re.MULTILINE)
-                content = re.sub(f"{re.escape(label)}\\b", global_label, content)
-            
-            if content != original_content:
-                with open(file_path, "w") as f:
-                    f.write(content)
+        # Pass 3: Rewrite the files in parallel, promoting the necessary labels.
+        # One alternation over all labels means each file is scanned exactly
+        # twice (definitions, then references) instead of twice per label.
+        label_alt = "|".join(re.escape(label) for label in sorted(labels_to_promote))
+        def_regex = re.compile(rf"^\s*({label_alt}):", re.MULTILINE)
+        ref_regex = re.compile(rf"({label_alt})\b")
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(_promote_labels_in_file, [(file_path, def_regex, ref_regex) for file_path in files_in_group]))
 
 #MARK: Main
 def main():
@@ -563,6 +694,11 @@ def main():
         help="Build objects to obj/target and obj/current (with -DSKIP_ASM), skip linking and checksum",
         action="store_true",
     )
+    parser.add_argument(
+        "--pretty-json",
+        help="Write objdiff.json indented for human reading instead of compact",
+        action="store_true",
+    )
     parser.add_argument(
         "-noloop",
         "--no-short-loop-workaround",
@@ -580,6 +716,29 @@ def main():
         if args.clean_only:
             return
 
+    # Skip splat and build file generation entirely if the inputs are
+    # unchanged since the last configure run. Every flag that changes what
+    # gets generated must be part of the key, or flipping it would be
+    # silently ignored by the cached run.
+    cache_key = {
+        "fingerprint": compute_configure_fingerprint(),
+        "objects": do_objects,
+        "skip_checksum": do_skip_checksum,
+        "pretty_json": args.pretty_json,
+        "no_short_loop_workaround": args.no_short_loop_workaround,
+    }
+    if os.path.exists("build.ninja") and os.path.exists(CONFIGURE_CACHE_PATH):
+        try:
+            with open(CONFIGURE_CACHE_PATH, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            cached = None
+        if cached == cache_key:
+            print("Configure inputs unchanged, nothing to do.")
+            return
+
+    import splat.scripts.split as split
+
     split.main([YAML_FILE], modes="all", verbose=False)
 
     promote_local_labels(YAML_FILE, split.config)
@@ -587,7 +746,7 @@ def main():
     linker_entries = split.linker_writer.entries
 
     if do_objects:
-        build_stuff(linker_entries, skip_checksum=True, objects_only=True, dual_objects=True)
+        build_stuff(linker_entries, skip_checksum=True, objects_only=True, dual_objects=True, pretty_json=args.pretty_json)
     else:
         build_stuff(linker_entries, do_skip_checksum)
 
@@ -596,5 +755,11 @@ def main():
     if not args.no_short_loop_workaround:
         replace_instructions_with_opcodes(split.config["options"]["asm_path"])
 
+    # Re-fingerprint after the asm rewriting passes so the next run with the
+    # same inputs sees a matching cache entry
+    cache_key["fingerprint"] = compute_configure_fingerprint()
+    with open(CONFIGURE_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump(cache_key, f)
+
 if __name__ == "__main__":
     main()
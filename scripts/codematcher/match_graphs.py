@@ -0,0 +1,297 @@
+"""
+Matches the call graph of the b3 demo against the retail call graph and
+propagates function labels from the demo onto the retail graph.
+
+Both graphs are exported from Ghidra in GDL format. The demo binary has
+symbols, so matching its call graph against the stripped retail graph lets
+us recover function names for retail. Writes the matched pairs to
+matches.txt and updates the labels in the retail GDL in place.
+"""
+import argparse
+import mmap
+import os
+import re
+from array import array
+
+# Single alternation matching either a node or an edge declaration; which
+# kind matched is decided by whether the first group is populated
+TOKEN_RE = re.compile(r'node: \{ title: "([^"]+)" label: "([^"]+)"|edge: \{ sourcename: "([^"]+)" targetname: "([^"]+)"')
+# Bytes pattern: the label rewrite runs directly over the mmapped retail GDL
+FULL_NODE_RE = re.compile(rb'(node: \{ title: "([^"]+)" label: ")[^"]*(")')
+
+def parse_gdl(file_path):
+    """
+    Parse a GDL file into a graph keyed by integer node ids. Titles are
+    interned to sequential ids at parse time so the matcher works on ints
+    instead of hashing title strings; the original titles and labels are
+    kept in id-indexed lists. GDL is line-oriented, so the file is streamed
+    line by line instead of loading the whole content into memory.
+    """
+    graph = {
+        "titles": [],      # id -> title
+        "labels": [],      # id -> label
+        "title_id": {},    # title -> id
+        "label_index": {}, # label -> [ids] (labels may collide)
+        "children": [],    # id -> [child ids]; flattened to CSR after parsing
+        "parent_counts": array("i"),  # id -> in-degree
+    }
+    title_id = graph["title_id"]
+
+    with open(file_path, "r", buffering=1 << 20) as f:
+        for line in f:
+            match = TOKEN_RE.search(line)
+            if not match:
+                continue
+
+            if match.group(1) is not None:
+                title, label = match.group(1), match.group(2)
+                title_id[title] = len(graph["titles"])
+                graph["titles"].append(title)
+                graph["labels"].append(label)
+                graph["label_index"].setdefault(label, []).append(title_id[title])
+                graph["children"].append([])
+                graph["parent_counts"].append(0)
+            else:
+                source, target = match.group(3), match.group(4)
+                if source in title_id and target in title_id:
+                    graph["children"][title_id[source]].append(title_id[target])
+                    # The matcher only ever compares in-degrees, so count
+                    # parents instead of storing who they are
+                    graph["parent_counts"][title_id[target]] += 1
+
+    # Flatten the children adjacency into CSR form: one contiguous int array
+    # of all child ids plus per-node offsets into it. The BFS then reads one
+    # contiguous slice per node instead of chasing per-node list objects.
+    offsets = array("i", [0])
+    flat = array("i")
+    for children in graph["children"]:
+        flat.extend(children)
+        offsets.append(len(flat))
+    graph["children_offsets"] = offsets
+    graph["children_flat"] = flat
+    del graph["children"]
+
+    return graph
+
+def find_entrypoint(graph, label):
+    """
+    Find the id of the node with the given label to use as the BFS root.
+    """
+    return graph["label_index"].get(label, [None])[0]
+
+def find_node_by_label(graph, label):
+    """
+    Find the id of the first node with the given label.
+    """
+    return graph["label_index"].get(label, [None])[0]
+
+def _match_kernel(
+    demo_offsets, demo_children, demo_labels, demo_parent_counts,
+    retail_offsets, retail_children, retail_labels, retail_parent_counts,
+    demo_entry, retail_entry, retail_count,
+):
+    """
+    BFS over the two CSR graphs, returning the matched (retail_id, demo_id)
+    pairs in match order. Works purely on integer sequences — degrees,
+    interned label ids, packed visited keys — so the hot loop stays on
+    int compares and indexed loads instead of hashing strings.
+    """
+    matches = []
+    # Each node can only be claimed by one match; first match wins, which
+    # also makes the mapping deterministic instead of last-writer-wins
+    matched_demo = bytearray(len(demo_offsets) - 1)
+    matched_retail = bytearray(retail_count)
+    # Pairs are marked visited when enqueued, not when dequeued, so a pair
+    # can never sit in a frontier more than once. For the pair space sizes
+    # these graphs produce, track visited pairs in a dense bit-packed
+    # bytearray — one load and a bit test per membership check instead of
+    # hashing an int into a set; fall back to a set if the bitmap would be
+    # unreasonably large (128 MB).
+    pair_space = (len(demo_offsets) - 1) * retail_count
+    use_bitmap = pair_space <= 1 << 30
+    if use_bitmap:
+        visited_bits = bytearray((pair_space >> 3) + 1)
+        entry_key = demo_entry * retail_count + retail_entry
+        visited_bits[entry_key >> 3] = 1 << (entry_key & 7)
+        visited = set()
+    else:
+        visited_bits = bytearray()
+        visited = {demo_entry * retail_count + retail_entry}
+    # Level-synchronous BFS: expand one whole frontier into the next. Pairs
+    # within a level are independent except for the matched/visited marks,
+    # so this is the shape a parallel frontier expansion drops into without
+    # changing the traversal order.
+    frontier = [(demo_entry, retail_entry)]
+
+    while frontier:
+        next_frontier = []
+        for demo_id, retail_id in frontier:
+            if matched_demo[demo_id] or matched_retail[retail_id]:
+                continue
+
+            demo_start = demo_offsets[demo_id]
+            demo_end = demo_offsets[demo_id + 1]
+            retail_start = retail_offsets[retail_id]
+            retail_end = retail_offsets[retail_id + 1]
+
+            # Heuristic check that the two nodes plausibly represent the
+            # same function, based on how similar their in/out degrees are.
+            # The parent bound is much tighter than the child bound, so
+            # test it first — it rejects most pairs with a single
+            # subtract/compare.
+            if abs(demo_parent_counts[demo_id] - retail_parent_counts[retail_id]) > 2:
+                continue
+            if abs((demo_end - demo_start) - (retail_end - retail_start)) > 10:
+                continue
+
+            matches.append((retail_id, demo_id))
+            matched_demo[demo_id] = 1
+            matched_retail[retail_id] = 1
+
+            # Pair children whose labels already agree first (library
+            # functions and anything retail kept a name for anchor the
+            # pairing), then pair the leftovers positionally; call sites
+            # appear in the same order in both graphs. Never cross every
+            # demo child with every retail child, which explodes the
+            # frontier on hub nodes.
+            n_retail_children = retail_end - retail_start
+            paired = [False] * n_retail_children
+            pairs = []
+            leftover_demo = []
+            for i in range(demo_start, demo_end):
+                demo_child = demo_children[i]
+                label = demo_labels[demo_child]
+                first = -1
+                for j in range(n_retail_children):
+                    if retail_labels[retail_children[retail_start + j]] == label:
+                        first = j
+                        break
+                if first >= 0 and not paired[first]:
+                    paired[first] = True
+                    pairs.append((demo_child, retail_children[retail_start + first]))
+                else:
+                    leftover_demo.append(demo_child)
+
+            slot = 0
+            for demo_child in leftover_demo:
+                while slot < n_retail_children and paired[slot]:
+                    slot += 1
+                if slot >= n_retail_children:
+                    break
+                pairs.append((demo_child, retail_children[retail_start + slot]))
+                slot += 1
+
+            for demo_child, retail_child in pairs:
+                if matched_demo[demo_child] or matched_retail[retail_child]:
+                    continue
+                key = demo_child * retail_count + retail_child
+                if use_bitmap:
+                    bit = 1 << (key & 7)
+                    if visited_bits[key >> 3] & bit:
+                        continue
+                    visited_bits[key >> 3] |= bit
+                elif key in visited:
+                    continue
+                else:
+                    visited.add(key)
+                next_frontier.append((demo_child, retail_child))
+
+        frontier = next_frontier
+
+    return matches
+
+def match_graphs(demo_graph, retail_graph, demo_entry, retail_entry):
+    """
+    Walk both graphs in lockstep from their entrypoints with a BFS,
+    recording retail_id -> (demo_id, demo_label) matches for pairs that
+    look alike; the label is stored up front so consumers don't chase it
+    through the demo graph per match.
+    """
+    retail_count = len(retail_graph["titles"])
+
+    # Intern the labels of both graphs into one shared id space so the
+    # kernel compares ints instead of strings
+    label_ids = {}
+    demo_label_ids = array("i", (label_ids.setdefault(label, len(label_ids)) for label in demo_graph["labels"]))
+    retail_label_ids = array("i", (label_ids.setdefault(label, len(label_ids)) for label in retail_graph["labels"]))
+
+    matches = _match_kernel(
+        demo_graph["children_offsets"], demo_graph["children_flat"], demo_label_ids, demo_graph["parent_counts"],
+        retail_graph["children_offsets"], retail_graph["children_flat"], retail_label_ids, retail_graph["parent_counts"],
+        demo_entry, retail_entry, retail_count,
+    )
+
+    mapping = {}
+    for retail_id, demo_id in matches:
+        mapping[retail_id] = (demo_id, demo_graph["labels"][demo_id])
+
+    return mapping
+
+def update_labels(retail_content, mapping, retail_graph):
+    """
+    Rewrite the labels of matched nodes in the retail GDL content (bytes,
+    typically an mmapped file) with a single substitution pass.
+    """
+    # mapping is fixed before the substitution starts, so precompute the
+    # title -> new label table once; the hot callback is then a single
+    # dict lookup with no per-match decoding or chained gets
+    titles = retail_graph["titles"]
+    label_by_title = {
+        titles[retail_id].encode(): label.encode()
+        for retail_id, (_, label) in mapping.items()
+    }
+
+    def replace_label(match):
+        label = label_by_title.get(match.group(2))
+        if label is None:
+            return match.group(0)
+        return match.group(1) + label + match.group(3)
+
+    return FULL_NODE_RE.sub(replace_label, retail_content)
+
+def main():
+    """
+    Main function, parses arguments and runs the graph matching.
+    """
+    parser = argparse.ArgumentParser(description="Match the demo call graph against retail")
+    parser.add_argument("demo_gdl", nargs="?", default="graph_b3_demo.gdl", help="Path to the demo GDL file")
+    parser.add_argument("retail_gdl", nargs="?", default="graph_b3_retail.gdl", help="Path to the retail GDL file")
+    parser.add_argument("--demo-entry", default="main", help="Label of the demo entrypoint function")
+    parser.add_argument("--retail-entry", default="main", help="Label of the retail entrypoint function")
+    args = parser.parse_args()
+
+    demo_graph = parse_gdl(args.demo_gdl)
+    retail_graph = parse_gdl(args.retail_gdl)
+
+    demo_entry = find_entrypoint(demo_graph, args.demo_entry)
+    retail_entry = find_node_by_label(retail_graph, args.retail_entry)
+    if demo_entry is None or retail_entry is None:
+        print("Could not find entrypoints in both graphs.")
+        return
+
+    mapping = match_graphs(demo_graph, retail_graph, demo_entry, retail_entry)
+    print(f"Matched {len(mapping)} functions.")
+
+    # Write through a large buffer with a generator, one syscall per buffer
+    # fill instead of one per line
+    with open("matches.txt", "w", buffering=1 << 20) as f:
+        f.writelines(
+            f"{retail_graph['titles'][retail_id]} -> {demo_graph['titles'][demo_id]}\n"
+            for retail_id, (demo_id, _) in mapping.items()
+        )
+
+    # mmap the retail GDL for the rewrite pass so the regex scans the page
+    # cache directly instead of a second in-heap copy of the file. The
+    # result goes to a temp file swapped in with os.replace, so a crash
+    # mid-write can't leave a truncated GDL behind.
+    with open(args.retail_gdl, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as retail_content:
+            updated_content = update_labels(retail_content, mapping, retail_graph)
+
+    tmp_path = args.retail_gdl + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(updated_content)
+    os.replace(tmp_path, args.retail_gdl)
+
+if __name__ == "__main__":
+    main()